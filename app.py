@@ -5,7 +5,6 @@ import os
 import pathway as pw
 from dotenv import load_dotenv
 from pydantic import BaseModel, ConfigDict, InstanceOf
-from pathway.xpacks.llm.servers import QASummaryRestServer
 from src.server.RadiologyServer import RadiologyRestServer
 from pathway.xpacks.llm.question_answering import BaseRAGQuestionAnswerer
 from pathway.xpacks.llm.mcp_server import PathwayMcp
@@ -58,7 +57,7 @@ class App(BaseModel):
 
         server = RadiologyRestServer(self.host, self.port, self.question_answerer)
         if self.mcp_server:
-            logging.info(f"MCP Server: http://{self.mcp_server.host}:{self.mcp_server.port}/mcp/")
+            logging.info("MCP Server: http://%s:%s/mcp/", self.mcp_server.host, self.mcp_server.port)
 
         server.run(
             with_cache=self.with_cache,
@@ -1,12 +1,19 @@
 import pathway as pw
-from typing import Dict, List, Optional
-from pydantic import BaseModel, ConfigDict, InstanceOf
 import logging
 from pathway.xpacks.llm.question_answering import BaseRAGQuestionAnswerer
 from src.store.RadiologyDocumentStore import RadiologyDocumentStore
 
 logger = logging.getLogger(__name__)
 
+# Default emergency-alerting prompt; {context} and {query} are filled in by BaseRAGQuestionAnswerer
+MEDICAL_PROMPT_TEMPLATE = (
+    "Based on these radiology findings: {context}\n\n"
+    "Patient Query: {query}\n\n"
+    "Provide immediate medical recommendations and alert level (RED/ORANGE/YELLOW/GREEN). "
+    "Focus on: 1) Immediate actions, 2) Treatment, 3) Escalation, 4) Timeline.\n\n"
+    "Response:"
+)
+
 class RadiologyQuestionAnswerer(BaseRAGQuestionAnswerer):
     """
     Radiology-focused question answerer built on BaseRAGQuestionAnswerer.
@@ -17,16 +24,7 @@ class RadiologyQuestionAnswerer(BaseRAGQuestionAnswerer):
 
     def __init__(self, llm, indexer, **kwargs):
         # Medical prompt (can be overridden via kwargs)
-        medical_prompt = kwargs.pop(
-            "prompt_template",
-            (
-        "Based on these radiology findings: {context}\n\n"
-        "Patient Query: {query}\n\n"
-        "Provide immediate medical recommendations and alert level (RED/ORANGE/YELLOW/GREEN). "
-                "Focus on: 1) Immediate actions, 2) Treatment, 3) Escalation, 4) Timeline.\n\n"
-        "Response:"
-            ),
-        )
+        medical_prompt = kwargs.pop("prompt_template", MEDICAL_PROMPT_TEMPLATE)
         search_topk = kwargs.pop("search_topk", 6)
 
         super().__init__(
@@ -40,11 +38,9 @@ class RadiologyQuestionAnswerer(BaseRAGQuestionAnswerer):
         self.indexer: RadiologyDocumentStore | object = indexer
 
 
-    class PatientSearchSchema(pw.Schema):
-        patient_id: str = pw.column_definition(dtype=str, default_value="")
-
-    class PatientQuerySchema(pw.Schema):
-        patient_name: str = pw.column_definition(dtype=str, default_value="")
+    # Request schemas are shared with RadiologyDocumentStore's MCP tools
+    PatientSearchSchema = RadiologyDocumentStore.PatientSearchSchema
+    PatientQuerySchema = RadiologyDocumentStore.PatientQuerySchema
 
     @pw.table_transformer
     def search_patient_by_id(self, request_table: pw.Table[PatientSearchSchema]) -> pw.Table:
@@ -1,13 +1,44 @@
+import asyncio
 import pathway as pw
-from typing import List, Optional, Literal, Dict, Any
+from typing import List, Optional
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from agentic_doc.parse import parse
 from agentic_doc.config import ParseConfig
+from pathway.xpacks.llm._utils import _prepare_executor
 
 logger = logging.getLogger(__name__)
 
+# JSON Schema for the fields LandingAI extracts from each radiology report
+RADIOLOGY_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "patient_id": {
+            "type": "string",
+            "description": "Patient identification number or ID"
+        },
+        "study_type": {
+            "type": "string", 
+            "description": "Type of radiological study (CT, MRI, X-ray, Ultrasound, etc.)"
+        },
+        "findings": {
+            "type": "string",
+            "description": "Key radiological findings and observations from the study"
+        },
+        "impression": {
+            "type": "string",
+            "description": "Radiologist's impression, conclusion, and clinical interpretation"
+        },
+        "critical_findings": {
+            "type": "string",
+            "description": "Any critical, urgent, or life-threatening findings requiring immediate attention"
+        }
+    },
+    "additionalProperties": False,
+    "required": ["study_type", "findings", "impression"]
+}
+
 
 class RadiologyExtractionModel(BaseModel):
     """Pydantic model for structured radiology report extraction using LandingAI"""
@@ -35,54 +66,28 @@ class LandingAIRadiologyParser(pw.UDF):
         self.async_mode = async_mode
         self.results_dir = results_dir
         self.capacity = capacity
-        from pathway.xpacks.llm._utils import _prepare_executor 
 
-        executor = _prepare_executor(async_mode)
+        # Create the results directory up front; parse() reuses the resolved path
+        results_path = Path(results_dir)
+        results_path.mkdir(parents=True, exist_ok=True)
+        self._results_dir_str = str(results_path)
+        self._parse_config = ParseConfig(api_key=api_key)
+        executor = _prepare_executor(async_mode, capacity=capacity)
         super().__init__(cache_strategy=cache_strategy, executor=executor)
     
     async def parse(self, contents: bytes) -> List[tuple[str, dict]]:
         """Parse radiology reports using LandingAI."""
         
-        # Create results directory
-        results_dir = Path(self.results_dir)
-        results_dir.mkdir(exist_ok=True)
-        # Define extraction schema in JSON Schema format
-        extraction_schema = {
-            "type": "object",
-            "properties": {
-                "patient_id": {
-                    "type": "string",
-                    "description": "Patient identification number or ID"
-                },
-                "study_type": {
-                    "type": "string", 
-                    "description": "Type of radiological study (CT, MRI, X-ray, Ultrasound, etc.)"
-                },
-                "findings": {
-                    "type": "string",
-                    "description": "Key radiological findings and observations from the study"
-                },
-                "impression": {
-                    "type": "string",
-                    "description": "Radiologist's impression, conclusion, and clinical interpretation"
-                },
-                "critical_findings": {
-                    "type": "string",
-                    "description": "Any critical, urgent, or life-threatening findings requiring immediate attention"
-                }
-            },
-            "additionalProperties": False,
-            "required": ["study_type", "findings", "impression"]
-        }
-        
-        # Parse document with LandingAI using proper JSON Schema
-        parsed_results = parse(
+        # agentic-doc's parse() is blocking; run it off the event loop so that
+        # up to `capacity` documents can be in flight concurrently
+        parsed_results = await asyncio.to_thread(
+            parse,
             contents,
             include_marginalia=True,
             include_metadata_in_markdown=True,
-            result_save_dir=str(results_dir),
-            extraction_schema=extraction_schema,
-            config=ParseConfig(api_key=self.api_key)
+            result_save_dir=self._results_dir_str,
+            extraction_schema=RADIOLOGY_EXTRACTION_SCHEMA,
+            config=self._parse_config
         )
         
         if not parsed_results:
@@ -91,25 +96,21 @@ class LandingAIRadiologyParser(pw.UDF):
         parsed_doc = parsed_results[0]
         text_content = getattr(parsed_doc, 'markdown', "")
 
-        # Extract structured data from extraction_metadata if available
-        extraction_data = {}
-        if hasattr(parsed_doc, 'extraction_metadata') and parsed_doc.extraction_metadata:
-            for field, data in parsed_doc.extraction_metadata.items():
-                if isinstance(data, dict) and 'value' in data and data['value']:
-                    extraction_data[field] = data['value']
-
-        # Create clean metadata with extracted fields
+        # Build string-typed metadata for Pathway directly from the extracted fields
         metadata = {
             "source": "landingai",
             "confidence": str(getattr(parsed_doc, 'confidence', 0.0)),
-            **{k: str(v) for k, v in extraction_data.items() if v is not None}
         }
+        extraction_metadata = getattr(parsed_doc, 'extraction_metadata', None)
+        if extraction_metadata:
+            for field, data in extraction_metadata.items():
+                if isinstance(data, dict) and data.get('value'):
+                    metadata[field] = str(data['value'])
         
-        # Ensure string types for Pathway
+        # Ensure string type for Pathway
         safe_text = str(text_content) if text_content else ""
-        safe_metadata = {k: str(v) if v is not None else "" for k, v in metadata.items()}
         
-        return [(safe_text, safe_metadata)]
+        return [(safe_text, metadata)]
     
     async def __wrapped__(self, contents: bytes, **kwargs) -> list[tuple[str, dict]]:
         return await self.parse(contents)
\ No newline at end of file
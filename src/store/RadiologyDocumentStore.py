@@ -1,18 +1,19 @@
 import pathway as pw
-from typing import Any, List, Optional, Dict
+from typing import Optional
 import os
-import json
+import functools
 import logging
-from datetime import datetime
-from pathlib import Path
-from pydantic import BaseModel, Field
-from dotenv import load_dotenv
 from pathway.xpacks.llm.document_store import DocumentStore
 from pathway.xpacks.llm.splitters import TokenCountSplitter
 from pathway.udfs import CacheStrategy
 
 logger = logging.getLogger(__name__)
 
+# Lowercased patient queries that mean "show every document"
+GENERIC_PATIENT_QUERIES = frozenset({"test patient", "radiology patient", "", "all"})
+# critical_findings values that mean nothing critical was reported
+NO_CRITICAL_FINDINGS = frozenset({"none", "", "no critical findings"})
+
 class RadiologyDocumentStore(DocumentStore):
     """
     Document store for radiology reports with LandingAI parsing
@@ -70,23 +71,38 @@ class RadiologyDocumentStore(DocumentStore):
         """Result schema for patient search - matches DocumentStore pattern"""
         result: pw.Json
     
-    @pw.table_transformer
-    def query_patient_extraction(self, request_table: pw.Table[PatientQuerySchema]) -> pw.Table[PatientQueryResultSchema]:
+    @functools.cached_property
+    def _parsed_docs_summary(self) -> pw.Table:
         """
-        MCP Tool: Simple extraction query using parsed_docs directly (no complex aggregations).
+        Single-row aggregate of parsed documents shared by the patient tools.
+        
+        Cached per store, so every endpoint registration (REST and MCP) of
+        both tools reads from the same reduce.
         """
-        all_docs = self.parsed_docs.reduce(
+        return self.parsed_docs.reduce(
             metadatas=pw.reducers.tuple(pw.this.metadata),
-            texts=pw.reducers.tuple(pw.this.text),
+            # Only the length of each text is reported, so avoid collecting full texts
+            text_lengths=pw.reducers.tuple(pw.this.text.str.len()),
             doc_count=pw.reducers.count(),
         )
+    
+    @pw.table_transformer
+    def query_patient_extraction(self, request_table: pw.Table[PatientQuerySchema]) -> pw.Table[PatientQueryResultSchema]:
+        """
+        MCP Tool: Simple extraction query using parsed_docs directly (no complex aggregations).
+        """
+        all_docs = self._parsed_docs_summary
         
         @pw.udf
-        def format_filtered_extraction_result(patient_query: str, metadatas: list, texts: list, doc_count: int) -> pw.Json:
+        def format_filtered_extraction_result(patient_query: str, metadatas: list, text_lengths: list, doc_count: int) -> pw.Json:
             all_results = []
             filtered_results = []
             
-            for i, (metadata, text) in enumerate(zip(metadatas or [], texts or [])):
+            # Generic queries (e.g. "all") return every document unfiltered
+            query_lower = patient_query.lower() if patient_query else ""
+            is_specific_query = bool(patient_query) and query_lower not in GENERIC_PATIENT_QUERIES
+            
+            for i, (metadata, text_length) in enumerate(zip(metadatas or [], text_lengths or [])):
                 if metadata:
                     try:
                         metadata_dict = metadata.as_dict() if hasattr(metadata, 'as_dict') else {}
@@ -98,14 +114,14 @@ class RadiologyDocumentStore(DocumentStore):
                             "impression_preview": str(metadata_dict.get("impression", ""))[:150] + "..." if metadata_dict.get("impression") else "No impression",
                             "critical_findings": metadata_dict.get("critical_findings", "none"),
                             "confidence": metadata_dict.get("confidence", "0.0"),
-                            "text_length": len(str(text)) if text else 0
+                            "text_length": text_length
                         }
                         all_results.append(doc_result)
                         
                         # Filter by patient query if provided and not generic
-                        if patient_query and patient_query.lower() not in ["test patient", "radiology patient", "", "all"]:
+                        if is_specific_query:
                             patient_id = str(metadata_dict.get("patient_id", "")).strip()
-                            if patient_id == patient_query or patient_query.lower() in patient_id.lower():
+                            if patient_id == patient_query or query_lower in patient_id.lower():
                                 filtered_results.append(doc_result)
                         else:
                             filtered_results.append(doc_result)
@@ -114,7 +130,17 @@ class RadiologyDocumentStore(DocumentStore):
                         # Skip problematic documents
                         continue
             
-            results_to_show = filtered_results if (patient_query and patient_query.lower() not in ["test patient", "radiology patient", "", "all"]) else all_results
+            results_to_show = filtered_results if is_specific_query else all_results
+            
+            # Tally summary counters in one pass over the shown results
+            with_patient_ids = with_findings = with_critical_findings = 0
+            for r in results_to_show:
+                if r["patient_id"] != "unknown":
+                    with_patient_ids += 1
+                if r["findings_preview"] != "No findings":
+                    with_findings += 1
+                if r["critical_findings"] not in NO_CRITICAL_FINDINGS:
+                    with_critical_findings += 1
             
             response = {
                 "query": patient_query,
@@ -124,9 +150,9 @@ class RadiologyDocumentStore(DocumentStore):
                 "summary": {
                     "total_documents_processed": len(all_results),
                     "documents_shown": len(results_to_show),
-                    "documents_with_patient_ids": len([r for r in results_to_show if r["patient_id"] != "unknown"]),
-                    "documents_with_findings": len([r for r in results_to_show if r["findings_preview"] != "No findings"]),
-                    "documents_with_critical_findings": len([r for r in results_to_show if r["critical_findings"] not in ["none", "", "no critical findings"]])
+                    "documents_with_patient_ids": with_patient_ids,
+                    "documents_with_findings": with_findings,
+                    "documents_with_critical_findings": with_critical_findings
                 },
                 "status": "success",
                 "note": "Live extraction data from parsed documents" + (" (filtered)" if len(filtered_results) < len(all_results) else " (all documents)")
@@ -137,7 +163,7 @@ class RadiologyDocumentStore(DocumentStore):
             result=format_filtered_extraction_result(
                 request_table.patient_name,
                 all_docs.metadatas,
-                all_docs.texts,
+                all_docs.text_lengths,
                 all_docs.doc_count
             )
         )
@@ -151,17 +177,15 @@ class RadiologyDocumentStore(DocumentStore):
         """
         logger.info("🔍 search_patient_by_id: Filtering by specific patient ID")
         
-        all_docs = self.parsed_docs.reduce(
-            metadatas=pw.reducers.tuple(pw.this.metadata),
-            texts=pw.reducers.tuple(pw.this.text),
-            total_docs=pw.reducers.count(),
-        )
+        all_docs = self._parsed_docs_summary
         
         @pw.udf
-        def search_by_patient_id(requested_patient_id: str, metadatas: list, texts: list, total_docs: int) -> pw.Json:
+        def search_by_patient_id(requested_patient_id: str, metadatas: list, text_lengths: list, total_docs: int) -> pw.Json:
 
             matching_docs = []
-            for i, (metadata, text) in enumerate(zip(metadatas or [], texts or [])):
+            # Subset of matching_docs whose patient ID equals the requested one
+            exact_matches = []
+            for i, (metadata, text_length) in enumerate(zip(metadatas or [], text_lengths or [])):
                 if metadata:
                     try:
                         metadata_dict = metadata.as_dict() if hasattr(metadata, 'as_dict') else {}
@@ -169,22 +193,27 @@ class RadiologyDocumentStore(DocumentStore):
                         
                         # Check if this document matches the requested patient ID
                         if doc_patient_id == requested_patient_id or (doc_patient_id and doc_patient_id != "unknown"):
-                            matching_docs.append({
+                            findings = str(metadata_dict.get("findings", ""))
+                            impression = str(metadata_dict.get("impression", ""))
+                            is_exact_match = doc_patient_id == requested_patient_id
+                            doc_result = {
                                 "document_index": i + 1,
                                 "patient_id": doc_patient_id,
                                 "study_type": metadata_dict.get("study_type", "unknown"),
-                                "findings": str(metadata_dict.get("findings", ""))[:200] + "..." if len(str(metadata_dict.get("findings", ""))) > 200 else str(metadata_dict.get("findings", "")),
-                                "impression": str(metadata_dict.get("impression", ""))[:200] + "..." if len(str(metadata_dict.get("impression", ""))) > 200 else str(metadata_dict.get("impression", "")),
+                                "findings": findings[:200] + "..." if len(findings) > 200 else findings,
+                                "impression": impression[:200] + "..." if len(impression) > 200 else impression,
                                 "critical_findings": metadata_dict.get("critical_findings", "none"),
                                 "confidence": metadata_dict.get("confidence", "0.0"),
-                                "text_length": len(str(text)) if text else 0,
-                                "exact_match": doc_patient_id == requested_patient_id
-                            })
+                                "text_length": text_length,
+                                "exact_match": is_exact_match
+                            }
+                            matching_docs.append(doc_result)
+                            if is_exact_match:
+                                exact_matches.append(doc_result)
                     except:
                         continue
             
             if matching_docs:
-                exact_matches = [doc for doc in matching_docs if doc["exact_match"]]
                 if exact_matches:
                     response = {
                         "patient_id": requested_patient_id,
@@ -218,8 +247,8 @@ class RadiologyDocumentStore(DocumentStore):
             result=search_by_patient_id(
                 request_table.patient_id,
                 all_docs.metadatas,
-                all_docs.texts,
-                all_docs.total_docs
+                all_docs.text_lengths,
+                all_docs.doc_count
             )
         )
         